@@ -3,6 +3,9 @@ Configuration Helper for Flight Fare Analysis Pipeline
 Modify these settings to change routes, dates, or scraping behavior
 """
 
+import os
+import functools
+import types
 from datetime import datetime, timedelta
 
 # ========== ROUTE CONFIGURATIONS ==========
@@ -45,6 +48,7 @@ STANDARD_CONFIG = {
     'headless': False,      # Set to True for fully automated runs
     'delay_min': 10,        # Minimum delay between requests (seconds)
     'delay_max': 20,        # Maximum delay between requests (seconds)
+    'max_parallel': 3,      # Dates scraped concurrently
 }
 
 # Quick test configuration (only 3 days)
@@ -53,6 +57,7 @@ QUICK_TEST_CONFIG = {
     'headless': False,
     'delay_min': 5,
     'delay_max': 10,
+    'max_parallel': 3,
 }
 
 # Automated configuration (for unattended runs)
@@ -61,6 +66,7 @@ AUTOMATED_CONFIG = {
     'headless': True,       # Fully automated - may fail on CAPTCHAs
     'delay_min': 15,        # Longer delays for better anti-bot avoidance
     'delay_max': 30,
+    'max_parallel': 3,
 }
 
 # ========== ACTIVE CONFIGURATION ==========
@@ -74,18 +80,18 @@ ACTIVE_SCRAPING = STANDARD_CONFIG
 
 # ========== HELPER FUNCTIONS ==========
 
+@functools.lru_cache(maxsize=1)
 def get_pipeline_config():
-    """Get the complete pipeline configuration"""
-    import os
+    """Get the complete pipeline configuration (cached, read-only)"""
+    config = {
+        **ACTIVE_ROUTE,
+        **ACTIVE_SCRAPING,
+        # Add directory configuration
+        'output_dir': os.path.abspath(os.path.join(os.path.dirname(__file__), 'data/raw')),
+    }
     
-    config = {}
-    config.update(ACTIVE_ROUTE)
-    config.update(ACTIVE_SCRAPING)
-    
-    # Add directory configuration
-    config['output_dir'] = os.path.abspath(os.path.join(os.path.dirname(__file__), 'data/raw'))
-    
-    return config
+    # Read-only view so callers can't mutate the cached object
+    return types.MappingProxyType(config)
 
 def print_config_summary():
     """Print current configuration summary"""
@@ -96,6 +102,7 @@ def print_config_summary():
     print(f"  Days to scrape: {config['days_to_scrape']}")
     print(f"  Headless mode: {config['headless']}")
     print(f"  Delay range: {config['delay_min']}-{config['delay_max']} seconds")
+    print(f"  Parallel dates: {config['max_parallel']}")
 
 if __name__ == "__main__":
     print_config_summary() 
\ No newline at end of file
@@ -4,8 +4,10 @@ Flight Fare Analysis Pipeline
 Main orchestrator script for scraping and processing flight data from MakeMyTrip
 """
 
+import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add scripts directory to path
@@ -13,89 +15,119 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
 # Import pipeline components
 from scraper import main as scrape_main
-from processor import main as process_main
+from processor import main as process_main, process_single_day
 
 # Import configuration
 from config import get_pipeline_config
 
+logger = logging.getLogger("pipeline")
+
 def print_pipeline_info():
     """Print pipeline configuration and summary"""
     config = get_pipeline_config()
-    print("=" * 70)
-    print("    FLIGHT FARE ANALYSIS PIPELINE")
-    print("=" * 70)
-    print(f"Route: {config['source_city']} → {config['destination_city']}")
-    print(f"Airports: {config['source_airport']} → {config['destination_airport']}")
-    print(f"Days to scrape: {config['days_to_scrape']}")
-    print(f"Headless mode: {config['headless']}")
-    print(f"Delay range: {config['delay_min']}-{config['delay_max']} seconds")
-    print(f"Data directory: {config['output_dir']}")
-    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 70)
+    rule = "=" * 70
+    # One write for the whole banner
+    logger.info(
+        f"{rule}\n"
+        f"    FLIGHT FARE ANALYSIS PIPELINE\n"
+        f"{rule}\n"
+        f"Route: {config['source_city']} → {config['destination_city']}\n"
+        f"Airports: {config['source_airport']} → {config['destination_airport']}\n"
+        f"Days to scrape: {config['days_to_scrape']}\n"
+        f"Headless mode: {config['headless']}\n"
+        f"Delay range: {config['delay_min']}-{config['delay_max']} seconds\n"
+        f"Parallel dates: {config['max_parallel']}\n"
+        f"Data directory: {config['output_dir']}\n"
+        f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"{rule}"
+    )
 
-def run_scraping_phase():
+def run_scraping_phase(on_day_complete=None):
     """Execute the data scraping phase"""
-    print("\n🔍 PHASE 1: DATA SCRAPING")
-    print("-" * 40)
-    print("Starting flight data scraping from MakeMyTrip...")
+    logger.info("\n🔍 PHASE 1: DATA SCRAPING\n" + "-" * 40 + "\nStarting flight data scraping from MakeMyTrip...")
     
     config = get_pipeline_config()
     if not config['headless']:
-        print("Note: Manual CAPTCHA solving may be required (headless=False)")
-    print()
+        logger.info("Note: Manual CAPTCHA solving may be required (headless=False)")
+    logger.info("")
     
     try:
-        scrape_main(config)
-        print("\n✅ Scraping phase completed successfully!")
+        scrape_main(config, on_day_complete=on_day_complete)
+        logger.info("\n✅ Scraping phase completed successfully!")
         return True
     except Exception as e:
-        print(f"\n❌ Scraping phase failed: {e}")
+        logger.error(f"\n❌ Scraping phase failed: {e}")
         return False
 
-def run_processing_phase():
+def collect_cleaned_days(day_futures):
+    """Gather days cleaned during scraping; failed ones are reprocessed from raw"""
+    cleaned_days = {}
+    for path, future in day_futures.items():
+        try:
+            cleaned_days[path] = future.result()
+        except Exception as e:
+            logger.warning(f"  ⚠️ Early processing failed for {os.path.basename(path)}: {e}")
+    return cleaned_days
+
+def run_processing_phase(cleaned_days=None):
     """Execute the data processing and aggregation phase"""
-    print("\n🔧 PHASE 2: DATA PROCESSING")
-    print("-" * 40)
-    print("Processing raw data: cleaning, outlier removal, and aggregation...")
+    logger.info("\n🔧 PHASE 2: DATA PROCESSING\n" + "-" * 40 + "\nProcessing raw data: cleaning, outlier removal, and aggregation...")
     
     try:
-        process_main()
-        print("\n✅ Processing phase completed successfully!")
-        print("\nDashboard-ready files created:")
+        process_main(cleaned_days)
         processed_dir = os.path.join(os.path.dirname(__file__), 'data/processed')
-        print(f"  📊 {os.path.join(processed_dir, 'all_flights_cleaned.parquet')}")
-        print(f"  📈 {os.path.join(processed_dir, 'monthly_summary_by_airline.csv')}")
-        print(f"  📈 {os.path.join(processed_dir, 'monthly_summary_by_segment.csv')}")
+        logger.info(
+            "\n✅ Processing phase completed successfully!\n"
+            "\nDashboard-ready files created:\n"
+            f"  📊 {os.path.join(processed_dir, 'all_flights_cleaned.parquet')}\n"
+            f"  📈 {os.path.join(processed_dir, 'monthly_summary_by_airline.csv')}\n"
+            f"  📈 {os.path.join(processed_dir, 'monthly_summary_by_segment.csv')}"
+        )
         return True
     except Exception as e:
-        print(f"\n❌ Processing phase failed: {e}")
+        logger.error(f"\n❌ Processing phase failed: {e}")
         return False
 
 def main():
     """Main pipeline orchestrator"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     print_pipeline_info()
     
-    # Phase 1: Scraping
-    scraping_success = run_scraping_phase()
+    # Phase 1: Scraping (each saved day is cleaned in a worker thread during the scraper's delays;
+    # Polars reads and cleans without holding the GIL, and threads hand the cleaned frames back unpickled)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        day_futures = {}
+        
+        def on_day_complete(path):
+            day_futures[path] = executor.submit(process_single_day, path)
+        
+        scraping_success = run_scraping_phase(on_day_complete)
+        cleaned_days = collect_cleaned_days(day_futures)
     
     if not scraping_success:
-        print("\n⚠️  Pipeline stopped due to scraping failure.")
-        print("You can manually run processing later with: python scripts/processor.py")
+        logger.warning(
+            "\n⚠️  Pipeline stopped due to scraping failure.\n"
+            "You can manually run processing later with: python scripts/processor.py"
+        )
         return
     
-    # Phase 2: Processing  
-    processing_success = run_processing_phase()
+    # Phase 2: Processing (outlier removal and aggregation over all days)
+    processing_success = run_processing_phase(cleaned_days)
     
     if processing_success:
-        print("\n🎉 PIPELINE COMPLETED SUCCESSFULLY!")
-        print("\nNext steps:")
-        print("1. Review the processed data files in data/processed/")
-        print("2. Use the clean data for dashboard creation or further analysis")
-        print("3. Consider running the pipeline again for updated data")
-        print("\nTo change routes or settings, edit config.py")
+        logger.info(
+            "\n🎉 PIPELINE COMPLETED SUCCESSFULLY!\n"
+            "\nNext steps:\n"
+            "1. Review the processed data files in data/processed/\n"
+            "2. Use the clean data for dashboard creation or further analysis\n"
+            "3. Consider running the pipeline again for updated data\n"
+            "\nTo change routes or settings, edit config.py"
+        )
     else:
-        print("\n⚠️  Scraping completed but processing failed.")
-        print("You can manually run processing with: python scripts/processor.py")
+        logger.warning(
+            "\n⚠️  Scraping completed but processing failed.\n"
+            "You can manually run processing with: python scripts/processor.py"
+        )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,41 +1,88 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
+import numpy as np
+import polars as pl
 import os
+import holidays
+from collections import namedtuple
 
 # --- Page Config ---
 st.set_page_config(layout="wide")
 
 # --- Load data ---
-@st.cache_data
-def load_data():
-    # Construct path to the data file relative to the script's location
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(script_dir, "processed_data", "aggregated_flight_data.csv")
-    df = pd.read_csv(data_path, parse_dates=["Date", "Departure Time", "Arrival Time", "Departure Date", "Arrival Date"])
-    df['DateStr'] = df['Date'].dt.strftime('%Y-%m-%d')
-    return df
+# Construct paths to the data files relative to the script's location
+PROCESSED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "processed_data")
+DATA_PATH = os.path.join(PROCESSED_DIR, "aggregated_flight_data.parquet")
+
+# Sidebar options (and the holiday calendar) derived from the data, computed once per process
+LoadedData = namedtuple("LoadedData", ["dates", "airlines", "timeblocks", "price_min", "price_max", "holiday_dates"])
+# The only columns the options are derived from; the rows themselves are filtered through the polars scan
+OPTION_COLUMNS = ["Date", "DateStr", "Airline Name", "Time Block", "Total Fare"]
+
+# Shared across sessions via cache_resource (one copy in memory): treat as read-only, never mutate in place
+@st.cache_resource
+def _load_df():
+    # Parquet written by preprocess.py keeps datetime dtypes and DateStr, so no parsing here.
+    # Arrow-backed dtypes: no conversion to NumPy/object arrays for columns that are only scanned once
+    df = pd.read_parquet(DATA_PATH, engine="pyarrow", columns=OPTION_COLUMNS, dtype_backend="pyarrow")
+    # Indian holidays for just the years in the data, as a datetime64[D] array for vectorized lookups
+    years = range(df["Date"].dt.year.min(), df["Date"].dt.year.max() + 1)
+    holiday_dates = np.array(sorted(holidays.IN(years=years).keys()), dtype="datetime64[D]")
+    return LoadedData(
+        dates=sorted(df["DateStr"].unique()),
+        airlines=sorted(df["Airline Name"].unique()),
+        timeblocks=sorted(df["Time Block"].unique()),
+        price_min=int(df["Total Fare"].min()),
+        price_max=int(np.ceil(df["Total Fare"].max())),
+        holiday_dates=holiday_dates
+    )
 
-df = load_data()
+@st.cache_resource
+def _scan_df():
+    # Lazy polars scan of the same file: sidebar predicates compile into one multi-threaded scan,
+    # and the price range is pushed down to the parquet row groups (the file is sorted by Total Fare).
+    # IsHoliday is a vectorized membership test evaluated in the scan, only for the rows that survive the filter
+    is_holiday = pl.col("Date").dt.date().is_in(pl.Series(_load_df().holiday_dates).implode())
+    return pl.scan_parquet(DATA_PATH).with_columns(is_holiday.alias("IsHoliday"))
+
+@st.cache_resource
+def _load_cube():
+    # Pre-aggregated sum/count of Total Fare per (DateStr, Airline Name, Time Block, Departure Hour)
+    return pd.read_parquet(os.path.join(PROCESSED_DIR, "fare_cube.parquet"), engine="pyarrow")
+
+data = _load_df()
+cube = _load_cube()
+CUBE_KEYS = ['DateStr', 'Airline Name', 'Time Block', 'Departure Hour']
+SCATTER_MAX_POINTS = 2000
+# Above this many flights the scatter defaults to a binned heatmap instead of one mark per flight
+SCATTER_POINT_ROWS = 500
+CATEGORY_COLUMNS = ['DateStr', 'Airline Name', 'Time Block', 'Source City', 'Destination City', 'Layover Type']
+# Columns the dashboard actually reads; airport codes and the split time-of-day columns are never decoded
+APP_COLUMNS = [
+    'Flight Number', 'Airline Name', 'Source City', 'Destination City', 'Date', 'DateStr',
+    'Departure Date', 'Departure Time', 'Departure Hour', 'Arrival Date', 'Arrival Time',
+    'Base Fare', 'Tax', 'Total Fare', 'Time Block', 'Layover Type', 'IsHoliday'
+]
 
 # --- Sidebar Filters ---
 st.sidebar.title("Filters")
 
 # Multi-select for dates
-all_dates = sorted(df["DateStr"].unique())
+all_dates = data.dates
 selected_dates = st.sidebar.multiselect("Select Date(s)", all_dates)
 
 # Multi-select for airlines
-all_airlines = ["All"] + sorted(df["Airline Name"].unique())
+all_airlines = ["All"] + data.airlines
 selected_airlines = st.sidebar.multiselect("Select Airline(s)", all_airlines, default=["All"])
 
 # Multi-select for time blocks
-all_timeblocks = ["All"] + sorted(df["Time Block"].unique())
+all_timeblocks = ["All"] + data.timeblocks
 selected_timeblocks = st.sidebar.multiselect("Select Time Block(s)", all_timeblocks, default=["All"])
 
 # Price Range Slider
-min_price = int(df["Total Fare"].min())
-max_price = int(df["Total Fare"].max())
+min_price = data.price_min
+max_price = data.price_max
 selected_price_range = st.sidebar.slider(
     "Select Price Range (₹)",
     min_value=min_price,
@@ -55,25 +102,157 @@ selected_denoising_methods = st.sidebar.multiselect(
 
 
 # --- Filtered Data ---
-filtered_df = df.copy()
-
-# Apply date filter
-if selected_dates:
-    filtered_df = filtered_df[filtered_df['DateStr'].isin(selected_dates)]
-
-# Apply airline filter
-if "All" not in selected_airlines:
-    filtered_df = filtered_df[filtered_df["Airline Name"].isin(selected_airlines)]
-
-# Apply time block filter
-if "All" not in selected_timeblocks:
-    filtered_df = filtered_df[filtered_df["Time Block"].isin(selected_timeblocks)]
-    
-# Apply price range filter
-filtered_df = filtered_df[
-    (filtered_df["Total Fare"] >= selected_price_range[0]) &
-    (filtered_df["Total Fare"] <= selected_price_range[1])
-]
+def _filter_values(selected, universe):
+    # None means "no filter": the selection covers every value, so no mask is built at all
+    chosen = frozenset(selected)
+    if chosen >= frozenset(universe):
+        return None
+    return tuple(sorted(chosen))  # sorted tuple keeps the cache key stable
+
+def _selection_mask(frame, dates_tuple, airlines_tuple, tbs_tuple):
+    # Build one combined mask (used on the small fare cube) and slice once
+    mask = np.ones(len(frame), dtype=bool)
+
+    # Apply date filter
+    if dates_tuple is not None:
+        mask &= frame['DateStr'].isin(frozenset(dates_tuple)).to_numpy()
+
+    # Apply airline filter
+    if airlines_tuple is not None:
+        mask &= frame["Airline Name"].isin(frozenset(airlines_tuple)).to_numpy()
+
+    # Apply time block filter
+    if tbs_tuple is not None:
+        mask &= frame["Time Block"].isin(frozenset(tbs_tuple)).to_numpy()
+
+    return mask
+
+@st.cache_data(max_entries=32)
+def apply_filters(dates_tuple, airlines_tuple, tbs_tuple, price_range):
+    # Keyed on the (hashable) selections only, so no frame is ever hashed.
+    # Returns the filtered rows together with the small per-chart mean tables, memoized as one entry.
+    predicate = pl.col("Total Fare").is_between(price_range[0], price_range[1])
+
+    # Apply date filter
+    if dates_tuple is not None:
+        predicate &= pl.col("DateStr").is_in(list(dates_tuple))
+
+    # Apply airline filter
+    if airlines_tuple is not None:
+        predicate &= pl.col("Airline Name").is_in(list(airlines_tuple))
+
+    # Apply time block filter
+    if tbs_tuple is not None:
+        predicate &= pl.col("Time Block").is_in(list(tbs_tuple))
+
+    # Back to pandas only at the chart/table boundary
+    filtered = _scan_df().filter(predicate).select(APP_COLUMNS).collect().to_pandas(use_pyarrow_extension_array=True)
+    filtered[CATEGORY_COLUMNS] = filtered[CATEGORY_COLUMNS].astype('category')
+    # DateStr categories are the full sorted date list, so its codes order (and group) rows by date
+    filtered['DateStr'] = filtered['DateStr'].cat.set_categories(data.dates)
+
+    # The cube has no fare dimension, so it is only valid when the price slider spans every fare
+    if price_range[0] <= min_price and price_range[1] >= max_price:
+        src = cube.iloc[_selection_mask(cube, dates_tuple, airlines_tuple, tbs_tuple)]
+    else:
+        src = filtered.groupby(CUBE_KEYS, observed=True).agg(
+            sum_fare=('Total Fare', 'sum'),
+            count=('Total Fare', 'count')
+        ).reset_index()
+
+    def mean_by(key):
+        # Mean of a slice = sum of sums / sum of counts
+        grouped = src.groupby(key, observed=True)[['sum_fare', 'count']].sum().reset_index()
+        grouped['Average Fare'] = grouped['sum_fare'] / grouped['count']
+        return grouped.rename(columns={'count': 'Flight Count'}).drop(columns='sum_fare')
+
+    return filtered, {key: mean_by(key) for key in CUBE_KEYS}
+
+@st.cache_data(max_entries=32, hash_funcs={pd.DataFrame: lambda _: None})
+def sorted_view(frame, filter_key, sort_column, ascending, limit):
+    # filter_key (the sidebar selections) identifies the frame, so its body is not hashed
+    # Only the top `limit` rows are shown: a partial selection (O(N log k)) instead of a full sort where supported
+    column = frame[sort_column]
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column):
+        return frame.nsmallest(limit, sort_column) if ascending else frame.nlargest(limit, sort_column)
+    return frame.sort_values(by=sort_column, ascending=ascending).head(limit)
+
+def _grouped_fare_stats(group_codes, fares, n_groups):
+    # One sort by (group, fare) serves the mean, median and 10% trimmed mean of every group:
+    # each group is a contiguous sorted run, so all three are offset arithmetic over a prefix sum
+    sorted_fares = fares[np.lexsort((fares, group_codes))]
+    counts = np.bincount(group_codes, minlength=n_groups)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    prefix = np.concatenate(([0.0], np.cumsum(sorted_fares)))
+    starts, ends = offsets[:-1], offsets[1:]
+
+    mean = (prefix[ends] - prefix[starts]) / counts
+    median = (sorted_fares[starts + (counts - 1) // 2] + sorted_fares[starts + counts // 2]) / 2
+    # Same cut as scipy's trim_mean; below 5 fares it is 0, i.e. the plain mean
+    cut = (counts * 0.1).astype(int)
+    trimmed = (prefix[ends - cut] - prefix[starts + cut]) / (counts - 2 * cut)
+    return counts, mean, median, trimmed
+
+@st.cache_data(max_entries=32)
+def compute_daily_stats(dates_tuple, airlines_tuple, tbs_tuple, price_range):
+    # Per-date fares under every denoising method, keyed on the same selections as apply_filters
+    # so both denoising sections reuse it and unchanged filters skip the whole computation
+    filtered, _ = apply_filters(dates_tuple, airlines_tuple, tbs_tuple, price_range)
+
+    # Sorted dates, the first row of each date, and every row's date index
+    # (integer work on the DateStr category codes, which follow date order; no string hashing or sorting)
+    category_codes = filtered['DateStr'].cat.codes.to_numpy()
+    used_codes, first_rows, date_codes = np.unique(category_codes, return_index=True, return_inverse=True)
+    dates = filtered['DateStr'].cat.categories[used_codes].to_numpy(dtype=object)
+    fares = filtered['Total Fare'].to_numpy(dtype='float64')
+
+    # Methods 1, 3 and 4: Raw Mean, Median and Trimmed Mean (10% on each side)
+    counts, raw_mean, median, trimmed_mean = _grouped_fare_stats(date_codes, fares, len(dates))
+
+    # Method 2: Filtered Mean (exclude weekend/holiday flights)
+    is_weekend = filtered['Date'].dt.dayofweek.to_numpy() >= 5
+    is_holiday = filtered['IsHoliday'].to_numpy(dtype=bool)
+    business = ~(is_weekend | is_holiday)
+    if business.any():
+        # One masking pass gives both the per-date business-day means and the overall business-day mean
+        business_codes, business_fares = date_codes[business], fares[business]
+        business_sum = np.bincount(business_codes, weights=business_fares, minlength=len(dates))
+        business_count = np.bincount(business_codes, minlength=len(dates))
+        # Dates with no business day flights fall back to the overall business day average
+        filtered_mean = np.full(len(dates), business_sum.sum() / business_count.sum())
+        has_business = business_count > 0
+        filtered_mean[has_business] = business_sum[has_business] / business_count[has_business]
+    else:
+        filtered_mean = raw_mean  # Fallback to raw mean
+
+    return pd.DataFrame({
+        'Date': dates,
+        'Raw Mean': raw_mean,
+        'Filtered Mean': filtered_mean,
+        'Median': median,
+        'Trimmed Mean (10%)': trimmed_mean,
+        'Flight Count': counts,
+        # Weekend/holiday status is the same for every flight of a date
+        'IsWeekend': is_weekend[first_rows],
+        'IsHoliday': is_holiday[first_rows]
+    })
+
+# No dates selected means all dates; "All" means every airline / time block
+filter_args = (
+    _filter_values(selected_dates or all_dates, all_dates),
+    _filter_values(all_airlines if "All" in selected_airlines else selected_airlines, all_airlines[1:]),
+    _filter_values(all_timeblocks if "All" in selected_timeblocks else selected_timeblocks, all_timeblocks[1:]),
+    tuple(selected_price_range)
+)
+# Sort-only reruns reuse this session's last result without even hashing into the cache
+filter_fp = hash(filter_args)
+if st.session_state.get('filter_fp') == filter_fp:
+    filtered_df, chart_data = st.session_state['filtered_result']
+else:
+    filtered_df, chart_data = apply_filters(*filter_args)
+    st.session_state['filter_fp'] = filter_fp
+    st.session_state['filtered_result'] = (filtered_df, chart_data)
+daily_stats_df = compute_daily_stats(*filter_args)
 
 # --- Title ---
 st.title("✈️ Flight Fare Visualizer")
@@ -83,63 +262,99 @@ st.markdown(f"**Total Flights Found:** {len(filtered_df)}")
 
 
 # --- Selections for Cross-Filtering ---
-selection_airline = alt.selection_multi(fields=['Airline Name'], name='airline_selector')
-selection_timeblock = alt.selection_multi(fields=['Time Block'], name='timeblock_selector')
-selection_hour = alt.selection_interval(encodings=['x'], name='hour_selector')
-selection_date = alt.selection_multi(fields=['DateStr'], name='date_selector')
-
-
-# --- Main Charts ---
-st.subheader("📊 Visual Analysis")
-
-col1, col2 = st.columns(2)
-
-with col1:
+selection_airline = alt.selection_point(fields=['Airline Name'], name='airline_selector', empty=True)
+selection_timeblock = alt.selection_point(fields=['Time Block'], name='timeblock_selector', empty=True)
+selection_hour = alt.selection_interval(encodings=['x'], name='hour_selector', empty=True)
+selection_date = alt.selection_point(fields=['DateStr'], name='date_selector', empty=True)
+
+
+# --- Chart Specs ---
+# Each builder returns the finished Vega-Lite dict; filter_key (the sidebar selections) identifies the data,
+# so reruns with unchanged filters reuse the spec and skip Altair's encoding and validation entirely
+def _to_spec(chart):
+    # As st.altair_chart does, leave out the default theme's fixed width/height so Streamlit sizes the chart
+    spec = chart.to_dict()
+    spec.pop('config', None)
+    return spec
+
+@st.cache_data(max_entries=32, hash_funcs={pd.DataFrame: lambda _: None})
+def mean_chart_specs(chart_data, filter_key):
     # Chart: Average Price by Airline
-    airline_chart = alt.Chart(filtered_df).mark_bar().encode(
+    airline_chart = alt.Chart(chart_data['Airline Name']).mark_bar().encode(
         x=alt.X("Airline Name", sort="-y"),
-        y="mean(Total Fare):Q",
+        y="Average Fare:Q",
         color=alt.condition(selection_airline, alt.value('steelblue'), alt.value('lightgray')),
-        tooltip=["Airline Name", "mean(Total Fare):Q"]
-    ).add_selection(
+        tooltip=["Airline Name", "Average Fare:Q"]
+    ).add_params(
         selection_airline
     ).properties(
         title="Average Fare by Airline"
     )
-    st.altair_chart(airline_chart, use_container_width=True)
 
     # Chart: Fare Trend by Departure Hour
-    hour_chart = alt.Chart(filtered_df).mark_line(point=True).encode(
+    hour_chart = alt.Chart(chart_data['Departure Hour']).mark_line(point=True).encode(
         x="Departure Hour:O",
-        y="mean(Total Fare):Q",
+        y="Average Fare:Q",
         color=alt.condition(selection_hour, alt.value('green'), alt.value('lightgray')),
-        tooltip=["Departure Hour", "mean(Total Fare):Q"]
-    ).add_selection(
+        tooltip=["Departure Hour", "Average Fare:Q"]
+    ).add_params(
         selection_hour
     ).properties(
         title="Average Fare vs Departure Hour"
     )
-    st.altair_chart(hour_chart, use_container_width=True)
 
-with col2:
     # Chart: Average Price by Time Block
-    time_chart = alt.Chart(filtered_df).mark_bar().encode(
+    time_chart = alt.Chart(chart_data['Time Block']).mark_bar().encode(
         x=alt.X("Time Block", sort=["Morning", "Afternoon", "Evening", "Night"]),
-        y="mean(Total Fare):Q",
+        y="Average Fare:Q",
         color=alt.condition(selection_timeblock, alt.value('orange'), alt.value('lightgray')),
-        tooltip=["Time Block", "mean(Total Fare):Q"]
-    ).add_selection(
+        tooltip=["Time Block", "Average Fare:Q"]
+    ).add_params(
         selection_timeblock
     ).properties(
         title="Average Fare by Time Block"
     )
-    st.altair_chart(time_chart, use_container_width=True)
-    
+
+    # Chart: Average Price by Date
+    date_trend_chart = alt.Chart(chart_data['DateStr']).mark_line(point=True, strokeWidth=3).encode(
+        x=alt.X("DateStr:O", title="Date", axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y("Average Fare:Q", title="Average Fare (₹)"),
+        color=alt.condition(selection_date, alt.value('red'), alt.value('lightcoral')),
+        tooltip=["DateStr:O", "Average Fare:Q", "Flight Count:Q"]
+    ).add_params(
+        selection_date
+    ).properties(
+        title="Average Fare Trend by Date",
+        height=400
+    )
+
+    return {
+        'Airline Name': _to_spec(airline_chart),
+        'Departure Hour': _to_spec(hour_chart),
+        'Time Block': _to_spec(time_chart),
+        'DateStr': _to_spec(date_trend_chart)
+    }
+
+@st.cache_data(max_entries=32, hash_funcs={pd.DataFrame: lambda _: None})
+def scatter_spec(frame, filter_key):
     # Combined filter for the scatter plot
     combined_filter = selection_airline & selection_timeblock & selection_hour
-    
-    # Scatter plot
-    scatter_plot = alt.Chart(filtered_df).mark_circle(size=60).encode(
+
+    # Scatter plot: cap the points sent to Vega with a stratified sample per (airline, hour) cell
+    scatter_df = frame
+    scatter_title = "All Flights (click on charts to filter)"
+    if len(frame) > SCATTER_MAX_POINTS:
+        scatter_keys = ['Airline Name', 'Departure Hour']
+        n_groups = frame.groupby(scatter_keys, observed=True).ngroups
+        per_group = max(1, SCATTER_MAX_POINTS // n_groups)
+        scatter_df = frame.sample(frac=1, random_state=0).groupby(scatter_keys, observed=True).head(per_group)
+        scatter_title = f"Sampled Flights: {len(scatter_df)} of {len(frame)} (click on charts to filter)"
+
+    # Only the encoded columns are serialised to the browser; fares are stored as float32, so they are sent
+    # rounded to the paisa rather than with float32 noise digits
+    scatter_df = scatter_df[['Flight Number', 'Airline Name', 'Departure Time', 'Total Fare']]
+    scatter_df = scatter_df.assign(**{'Total Fare': scatter_df['Total Fare'].astype('float64').round(2)})
+    scatter_plot = alt.Chart(scatter_df).mark_circle(size=60).encode(
         x='Departure Time:T',
         y='Total Fare:Q',
         color='Airline Name:N',
@@ -147,27 +362,59 @@ with col2:
     ).transform_filter(
         combined_filter
     ).properties(
-        title="All Flights (click on charts to filter)"
+        title=scatter_title
     )
-    st.altair_chart(scatter_plot, use_container_width=True)
+    return _to_spec(scatter_plot)
+
+@st.cache_data(max_entries=32, hash_funcs={pd.DataFrame: lambda _: None})
+def scatter_heatmap_spec(frame, filter_key):
+    # Bin flights server-side into (airline, 30-minute departure slot) cells, so the marks sent to Vega
+    # are bounded by airlines x 48 however many flights match
+    departure_slot = frame['Departure Time'].astype('datetime64[ns]').dt.floor('30min').dt.strftime('%H:%M')
+    # Averaged from the fares rounded back to the paisa, as float64 (they are stored as float32)
+    frame = frame.assign(**{'Total Fare': frame['Total Fare'].astype('float64').round(2)})
+    cells = frame.groupby(['Airline Name', departure_slot.rename('Departure Slot')], observed=True).agg(**{
+        'Average Fare': ('Total Fare', 'mean'),
+        'Flight Count': ('Total Fare', 'size')
+    }).reset_index()
+    heatmap = alt.Chart(cells).mark_rect().encode(
+        x=alt.X('Departure Slot:O', title='Departure Time (30 min slots)'),
+        y='Airline Name:N',
+        color=alt.Color('Average Fare:Q', scale=alt.Scale(scheme='orangered')),
+        tooltip=['Airline Name', 'Departure Slot', 'Average Fare:Q', 'Flight Count:Q']
+    ).properties(
+        title=f"Average Fare by Airline and Departure Slot ({len(frame)} flights)"
+    )
+    return _to_spec(heatmap)
+
+chart_specs = mean_chart_specs(chart_data, filter_args)
+
+
+# --- Main Charts ---
+st.subheader("📊 Visual Analysis")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.vega_lite_chart(chart_specs['Airline Name'], use_container_width=True)
+    st.vega_lite_chart(chart_specs['Departure Hour'], use_container_width=True)
+
+with col2:
+    st.vega_lite_chart(chart_specs['Time Block'], use_container_width=True)
+
+    # The scatter is the only chart that ships individual rows, so it is rendered on demand
+    if st.checkbox("Show flight scatter plot"):
+        # Individual flights by default only for small selections; larger ones are binned unless asked for
+        if st.toggle("Show individual flights", value=len(filtered_df) <= SCATTER_POINT_ROWS):
+            st.vega_lite_chart(scatter_spec(filtered_df, filter_args), use_container_width=True)
+        else:
+            st.vega_lite_chart(scatter_heatmap_spec(filtered_df, filter_args), use_container_width=True)
 
 
 # --- Price vs Date Chart ---
 st.subheader("📅 Average Fare by Date")
 
-date_trend_chart = alt.Chart(filtered_df).mark_line(point=True, strokeWidth=3).encode(
-    x=alt.X("DateStr:O", title="Date", axis=alt.Axis(labelAngle=-45)),
-    y=alt.Y("mean(Total Fare):Q", title="Average Fare (₹)"),
-    color=alt.condition(selection_date, alt.value('red'), alt.value('lightcoral')),
-    tooltip=["DateStr:O", "mean(Total Fare):Q", "count():Q"]
-).add_selection(
-    selection_date
-).properties(
-    title="Average Fare Trend by Date",
-    height=400
-)
-
-st.altair_chart(date_trend_chart, use_container_width=True)
+st.vega_lite_chart(chart_specs['DateStr'], use_container_width=True)
 
 
 # --- Data Table with Sorting ---
@@ -193,19 +440,26 @@ with st.expander("🔍 Show and Sort Raw Data Table", expanded=True):
         index=existing_display_columns.index('Total Fare') # Default to Total Fare
     )
     sort_ascending = st.toggle("Ascending", value=True)
+    row_limit = st.number_input("Rows to display", min_value=100, max_value=10000, value=500, step=100)
     
-    sorted_df = filtered_df.sort_values(by=sort_column, ascending=sort_ascending)
+    sorted_df = sorted_view(filtered_df, filter_args, sort_column, sort_ascending, int(row_limit))
     
     # --- Prepare and Format DataFrame for Display ---
-    display_df = sorted_df.copy()
+    # A new frame holding only the displayed columns (sorted_df is cached, so it is never modified);
+    # reindex rather than [] so the formatting below is not treated as a write to a slice
+    display_df = sorted_df.reindex(columns=existing_display_columns)
 
     # Format date and time columns
     display_df['Departure Date'] = display_df['Departure Date'].dt.strftime('%d-%m-%Y')
     display_df['Arrival Date'] = display_df['Arrival Date'].dt.strftime('%d-%m-%Y')
-    display_df['Departure Time'] = display_df['Departure Time'].dt.strftime('%H:%M:%S')
-    display_df['Arrival Time'] = display_df['Arrival Time'].dt.strftime('%H:%M:%S')
+    # (Arrow timestamps print fractional seconds for %S, so format the displayed rows as NumPy datetimes)
+    display_df['Departure Time'] = display_df['Departure Time'].astype('datetime64[ns]').dt.strftime('%H:%M:%S')
+    display_df['Arrival Time'] = display_df['Arrival Time'].astype('datetime64[ns]').dt.strftime('%H:%M:%S')
+    # Fares are stored as float32; show them to the paisa rather than with float32 noise digits
+    fare_columns = ['Base Fare', 'Tax', 'Total Fare']
+    display_df[fare_columns] = display_df[fare_columns].astype('float64').round(2)
     
-    st.dataframe(display_df[existing_display_columns])
+    st.dataframe(display_df)
 
 
 # --- FILTERED DENOISING CHARTS SECTION ---
@@ -213,80 +467,17 @@ if selected_denoising_methods:
     st.subheader("📈 Filtered Denoising Comparison")
     st.caption(f"Showing selected methods: {', '.join(selected_denoising_methods)}")
     
-    # Import required libraries for denoising (moved up here)
-    import holidays
-    from scipy import stats
-    import numpy as np
-    
-    # Create a copy for denoising analysis
-    filter_denoise_df = filtered_df.copy()
-    
-    # Add weekday/weekend flags
-    filter_denoise_df['IsWeekend'] = filter_denoise_df['Date'].dt.dayofweek >= 5
-    
-    # Add holiday flags using Indian holidays
-    india_holidays = holidays.IN()
-    filter_denoise_df['IsHoliday'] = filter_denoise_df['Date'].dt.date.apply(lambda x: x in india_holidays)
-    
-    # Calculate daily aggregates for filtered view
-    filter_daily_stats = []
-    
-    for date_str in sorted(filter_denoise_df['DateStr'].unique()):
-        date_data = filter_denoise_df[filter_denoise_df['DateStr'] == date_str]
-        
-        if len(date_data) > 0:
-            fares = date_data['Total Fare'].values
-            
-            # Calculate all methods but only include selected ones
-            methods_data = {}
-            
-            # Method 1: Raw Mean
-            if "Raw Mean" in selected_denoising_methods:
-                methods_data['Raw Mean'] = np.mean(fares)
-            
-            # Method 2: Filtered Mean (exclude weekend/holiday flights)
-            if "Filtered Mean" in selected_denoising_methods:
-                # Filter out flights from weekends and holidays across all data
-                business_day_data = filter_denoise_df[
-                    (filter_denoise_df['IsWeekend'] == False) & 
-                    (filter_denoise_df['IsHoliday'] == False)
-                ]
-                
-                if len(business_day_data) > 0:
-                    # Calculate mean from business days only for the current date
-                    current_date_business = business_day_data[business_day_data['DateStr'] == date_str]
-                    if len(current_date_business) > 0:
-                        methods_data['Filtered Mean'] = np.mean(current_date_business['Total Fare'].values)
-                    else:
-                        # If current date has no business day flights, use overall business day average
-                        methods_data['Filtered Mean'] = np.mean(business_day_data['Total Fare'].values)
-                else:
-                    methods_data['Filtered Mean'] = np.mean(fares)  # Fallback to raw mean
-            
-            # Method 3: Median
-            if "Median" in selected_denoising_methods:
-                methods_data['Median'] = np.median(fares)
-            
-            # Method 4: Trimmed Mean
-            if "Trimmed Mean (10%)" in selected_denoising_methods:
-                if len(fares) >= 5:
-                    methods_data['Trimmed Mean (10%)'] = stats.trim_mean(fares, 0.1)
-                else:
-                    methods_data['Trimmed Mean (10%)'] = np.mean(fares)
-            
-            # Add to stats with date info
-            for method, value in methods_data.items():
-                filter_daily_stats.append({
-                    'Date': date_str,
-                    'Method': method,
-                    'Average Fare': value,
-                    'Flight Count': len(date_data)
-                })
+    # Long format for the selected methods only, in the sidebar's method order
+    selected_method_columns = [method for method in all_denoising_methods if method in selected_denoising_methods]
+    filter_plot_data = daily_stats_df.melt(
+        id_vars=['Date', 'Flight Count'],
+        value_vars=selected_method_columns,
+        var_name='Method',
+        value_name='Average Fare'
+    )[['Date', 'Method', 'Average Fare', 'Flight Count']]
     
     # Create filtered chart
-    if filter_daily_stats:
-        filter_plot_data = pd.DataFrame(filter_daily_stats)
-        
+    if not filter_plot_data.empty:
         # Define consistent colors for each method
         method_colors = {
             'Raw Mean': '#e74c3c',      # Red
@@ -298,52 +489,47 @@ if selected_denoising_methods:
         # Create color scale for selected methods only
         selected_colors = [method_colors[method] for method in selected_denoising_methods]
         
-        filtered_denoising_chart = alt.Chart(filter_plot_data).mark_line(
-            point=True, 
-            strokeWidth=3,
-            opacity=0.8
-        ).encode(
-            x=alt.X('Date:O', title='Date', axis=alt.Axis(labelAngle=-45)),
-            y=alt.Y('Average Fare:Q', title='Average Fare (₹)'),
-            color=alt.Color(
-                'Method:N',
-                scale=alt.Scale(
-                    domain=selected_denoising_methods,
-                    range=selected_colors
-                ),
-                legend=alt.Legend(title="Denoising Method", orient="top")
-            ),
-            tooltip=['Date:O', 'Method:N', 'Average Fare:Q', 'Flight Count:Q']
-        ).properties(
-            title=f'Fare Comparison: {len(selected_denoising_methods)} Selected Method(s)',
-            height=400
-        )
+        # Plain Vega-Lite dict: nothing here needs Altair, so its encoding/validation layer is skipped
+        filtered_denoising_spec = {
+            "mark": {"type": "line", "point": True, "strokeWidth": 3, "opacity": 0.8},
+            "encoding": {
+                "x": {"field": "Date", "type": "ordinal", "title": "Date", "axis": {"labelAngle": -45}},
+                "y": {"field": "Average Fare", "type": "quantitative", "title": "Average Fare (₹)"},
+                "color": {
+                    "field": "Method",
+                    "type": "nominal",
+                    "scale": {"domain": selected_denoising_methods, "range": selected_colors},
+                    "legend": {"title": "Denoising Method", "orient": "top"}
+                },
+                "tooltip": [
+                    {"field": "Date", "type": "ordinal"},
+                    {"field": "Method", "type": "nominal"},
+                    {"field": "Average Fare", "type": "quantitative"},
+                    {"field": "Flight Count", "type": "quantitative"}
+                ]
+            },
+            "title": f'Fare Comparison: {len(selected_denoising_methods)} Selected Method(s)',
+            "height": 400
+        }
         
-        st.altair_chart(filtered_denoising_chart, use_container_width=True)
+        st.vega_lite_chart(filter_plot_data, filtered_denoising_spec, use_container_width=True)
         
         # Show summary statistics for selected methods
         if len(selected_denoising_methods) > 1:
             st.subheader("📊 Method Comparison Summary")
             
-            # Calculate statistics for each selected method
-            comparison_stats = {}
-            for method in selected_denoising_methods:
-                method_data = filter_plot_data[filter_plot_data['Method'] == method]['Average Fare']
-                comparison_stats[method] = {
-                    'Mean': method_data.mean(),
-                    'Std Dev': method_data.std(),
-                    'Min': method_data.min(),
-                    'Max': method_data.max()
-                }
+            # Statistics for each selected method, straight from the shared wide daily frame
+            comparison_stats = daily_stats_df[selected_denoising_methods].agg(['mean', 'std', 'min', 'max'])
             
             # Display in columns
             cols = st.columns(len(selected_denoising_methods))
-            for i, (method, stats) in enumerate(comparison_stats.items()):
+            for i, method in enumerate(selected_denoising_methods):
+                method_stats = comparison_stats[method]
                 with cols[i]:
                     st.markdown(f"**{method}**")
-                    st.metric("Average", f"₹{stats['Mean']:,.0f}")
-                    st.metric("Std Dev", f"₹{stats['Std Dev']:,.0f}")
-                    st.metric("Range", f"₹{stats['Min']:,.0f} - ₹{stats['Max']:,.0f}")
+                    st.metric("Average", f"₹{method_stats['mean']:,.0f}")
+                    st.metric("Std Dev", f"₹{method_stats['std']:,.0f}")
+                    st.metric("Range", f"₹{method_stats['min']:,.0f} - ₹{method_stats['max']:,.0f}")
         
     else:
         st.warning("No data available for the selected denoising methods with current filters.")
@@ -351,94 +537,10 @@ if selected_denoising_methods:
 else:
     st.info("👈 Please select at least one denoising method from the sidebar to view comparison charts.")
 
-# Import required libraries for denoising
-import holidays
-from scipy import stats
-import numpy as np
-
-# Create a copy for denoising analysis (to avoid altering original charts)
-denoise_df = filtered_df.copy()
-
-# Add weekday/weekend flags
-denoise_df['IsWeekend'] = denoise_df['Date'].dt.dayofweek >= 5
-
-# Add holiday flags using Indian holidays
-india_holidays = holidays.IN()
-denoise_df['IsHoliday'] = denoise_df['Date'].dt.date.apply(lambda x: x in india_holidays)
-
-# Calculate daily aggregates using different denoising methods
-daily_stats = []
-
-for date_str in sorted(denoise_df['DateStr'].unique()):
-    date_data = denoise_df[denoise_df['DateStr'] == date_str]
-    
-    if len(date_data) > 0:
-        fares = date_data['Total Fare'].values
-        
-        # Method 1: Raw Mean (no filtering)
-        raw_mean = np.mean(fares)
-        
-        # Method 2: Filtered Mean (exclude weekend/holiday flights)
-        # Filter out flights from weekends and holidays across all data
-        business_day_data = denoise_df[
-            (denoise_df['IsWeekend'] == False) & 
-            (denoise_df['IsHoliday'] == False)
-        ]
-        
-        if len(business_day_data) > 0:
-            # Calculate mean from business days only for the current date
-            current_date_business = business_day_data[business_day_data['DateStr'] == date_str]
-            if len(current_date_business) > 0:
-                filtered_mean = np.mean(current_date_business['Total Fare'].values)
-            else:
-                # If current date has no business day flights, use overall business day average
-                filtered_mean = np.mean(business_day_data['Total Fare'].values)
-        else:
-            filtered_mean = raw_mean  # Fallback to raw mean
-        
-        # Method 3: Median (robust to outliers)
-        median_fare = np.median(fares)
-        
-        # Method 4: Trimmed Mean (10% trimming on each side)
-        if len(fares) >= 5:  # Need at least 5 data points for 10% trimming
-            trimmed_mean = stats.trim_mean(fares, 0.1)
-        else:
-            trimmed_mean = raw_mean
-        
-        # Get weekend/holiday status for the current date
-        is_weekend = date_data['IsWeekend'].iloc[0]
-        is_holiday = date_data['IsHoliday'].iloc[0]
-        
-        daily_stats.append({
-            'Date': date_str,
-            'Raw Mean': raw_mean,
-            'Filtered Mean': filtered_mean,
-            'Median': median_fare,
-            'Trimmed Mean (10%)': trimmed_mean,
-            'Flight Count': len(date_data),
-            'IsWeekend': is_weekend,
-            'IsHoliday': is_holiday
-        })
-
-# Convert to DataFrame for plotting
-daily_stats_df = pd.DataFrame(daily_stats)
-
-# Create comparison chart
+# Recommendation section: reads the same cached daily stats as the comparison chart
 if not daily_stats_df.empty:
-    # Reshape data for Altair (melt the dataframe)
-    plot_data = daily_stats_df.melt(
-        id_vars=['Date', 'Flight Count', 'IsWeekend', 'IsHoliday'],
-        value_vars=['Raw Mean', 'Filtered Mean', 'Median', 'Trimmed Mean (10%)'],
-        var_name='Method',
-        value_name='Average Fare'
-    )
-
-    variability = {
-        'Raw Mean': daily_stats_df['Raw Mean'].std(),
-        'Filtered Mean': daily_stats_df['Filtered Mean'].std(),
-        'Median': daily_stats_df['Median'].std(),
-        'Trimmed Mean (10%)': daily_stats_df['Trimmed Mean (10%)'].std()
-    }
+    # Day-to-day variability of every method
+    variability = daily_stats_df[all_denoising_methods].std()
     
     # Method recommendation
     st.subheader("💡 Method Recommendation")
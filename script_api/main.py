@@ -1,13 +1,35 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import yaml
 from datetime import datetime, timedelta
 import os
 from typing import List, Dict, Any
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Let calls start at most once every `interval` seconds, across all threads"""
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._next_start = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until this caller's start time; each caller reserves the next free slot"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        time.sleep(start - now)
 
 
 class FlightDataFetcher:
+    MAX_RATE_LIMITED_ATTEMPTS = 4
+    
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize with configuration from YAML file"""
         with open(config_path, 'r') as file:
@@ -17,6 +39,23 @@ class FlightDataFetcher:
         self.api_host = self.config['api']['host']
         self.base_url = self.config['api']['base_url']
         
+        # One request starts every `delay_seconds` (the API's pace); up to `concurrency` of them may be
+        # in flight at once, so a slow response doesn't hold back the next request
+        self.concurrency = self.config['api'].get('concurrency', 4)
+        self.rate_limiter = RateLimiter(self.config['api']['delay_seconds'])
+        
+        # One pooled keep-alive session for every request, so the TLS handshake is paid once per run;
+        # transient 5xx failures are retried with backoff (429s go back through the rate limiter, see
+        # get_flight_data)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "X-RapidAPI-Key": self.api_key,
+            "X-RapidAPI-Host": self.api_host,
+            "Accept-Encoding": "gzip"
+        })
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency, max_retries=retries))
+        
         # Create output directory
         os.makedirs(self.config['output']['directory'], exist_ok=True)
     
@@ -33,16 +72,16 @@ class FlightDataFetcher:
             "currency": self.config['search_params']['currency']
         }
         
-        headers = {
-            "X-RapidAPI-Key": self.api_key,
-            "X-RapidAPI-Host": self.api_host
-        }
-        
         try:
             print(f"Making request to: {url}")
             print(f"Query params: {querystring}")
             
-            response = requests.get(url, headers=headers, params=querystring)
+            # A rate-limited (429) request waits for its next slot before it is re-sent
+            for _ in range(self.MAX_RATE_LIMITED_ATTEMPTS):
+                self.rate_limiter.acquire()
+                response = self.session.get(url, params=querystring, timeout=self.config['api'].get('timeout_seconds', 10))
+                if response.status_code != 429:
+                    break
             
             print(f"Response status: {response.status_code}")
             print(f"Response headers: {dict(response.headers)}")
@@ -59,77 +98,83 @@ class FlightDataFetcher:
             print(f"Response content: {response.text if 'response' in locals() else 'No response'}")
             return []
     
-    def process_flight_data(self, raw_data: List[Dict], date: str) -> List[Dict]:
+    def process_flight_data(self, raw_data: List[Dict], date: str) -> pd.DataFrame:
         """Process raw API data into structured format"""
-        processed_flights = []
+        # Built column by column and turned into a DataFrame in one shot (no per-row dict inference)
+        columns = {
+            'Flight Number': [], 'Airline Name': [], 'Source City': [], 'Destination City': [],
+            'Source Airport Code': [], 'Destination Airport Code': [], 'Date': [],
+            'Departure Time': [], 'Arrival Time': [], 'Base Fare': [], 'Layover Type': []
+        }
         
         for flight in raw_data:
             # Filter for non-stop flights only
             stops = flight.get('stops', '').lower()
             if stops not in ['direct', 'non stop', 'nonstop']:
                 continue
-                
-            flight_info = {
-                'Flight Number': flight.get('flight_code', ''),
-                'Airline Name': flight.get('flight_name', ''),
-                'Source City': flight.get('departureAirport', {}).get('city', ''),
-                'Destination City': flight.get('arrivalAirport', {}).get('city', ''),
-                'Source Airport Code': flight.get('departureAirport', {}).get('code', ''),
-                'Destination Airport Code': flight.get('arrivalAirport', {}).get('code', ''),
-                'Date': date,
-                'Departure Time': flight.get('departureAirport', {}).get('time', ''),
-                'Arrival Time': flight.get('arrivalAirport', {}).get('time', ''),
-                'Base Fare': flight.get('totals', {}).get('base', flight.get('totals', {}).get('total', 0)),
-                'Layover Type': 'Non-stop'
-            }
-            processed_flights.append(flight_info)
+            
+            departure = flight.get('departureAirport', {})
+            arrival = flight.get('arrivalAirport', {})
+            totals = flight.get('totals', {})
+            columns['Flight Number'].append(flight.get('flight_code', ''))
+            columns['Airline Name'].append(flight.get('flight_name', ''))
+            columns['Source City'].append(departure.get('city', ''))
+            columns['Destination City'].append(arrival.get('city', ''))
+            columns['Source Airport Code'].append(departure.get('code', ''))
+            columns['Destination Airport Code'].append(arrival.get('code', ''))
+            columns['Date'].append(date)
+            columns['Departure Time'].append(departure.get('time', ''))
+            columns['Arrival Time'].append(arrival.get('time', ''))
+            columns['Base Fare'].append(totals.get('base', totals.get('total', 0)))
+            columns['Layover Type'].append('Non-stop')
         
-        return processed_flights
+        return pd.DataFrame(columns)
     
-    def save_to_file(self, data: List[Dict], date: str):
-        """Save data to Excel/CSV file"""
-        if not data:
+    def save_to_file(self, df: pd.DataFrame, date: str):
+        """Save data to Parquet/Excel/CSV file"""
+        if df.empty:
             print(f"No data to save for {date}")
             return
         
-        df = pd.DataFrame(data)
-        
         # Generate filename
-        file_format = self.config['output']['format']
+        file_format = self.config['output'].get('format', 'parquet')
         filename = f"flights_{date.replace('-', '_')}.{file_format}"
         filepath = os.path.join(self.config['output']['directory'], filename)
         
         # Save based on format
-        if file_format == 'xlsx':
+        if file_format == 'parquet':
+            # Columnar and binary: preprocess.py reads it back without any XML/text parsing
+            df.to_parquet(filepath, engine='pyarrow', compression='snappy', index=False)
+        elif file_format == 'xlsx':
             df.to_excel(filepath, index=False)
         else:  # csv
             df.to_csv(filepath, index=False)
         
-        print(f"Saved {len(data)} flights to {filepath}")
+        print(f"Saved {len(df)} flights to {filepath}")
+    
+    def fetch_single_day(self, date_str: str):
+        """Fetch, process and save flight data for one date"""
+        print(f"Fetching data for {date_str}...")
+        
+        raw_data = self.get_flight_data(
+            self.config['route']['from'], 
+            self.config['route']['to'], 
+            date_str
+        )
+        
+        processed_data = self.process_flight_data(raw_data, date_str)
+        self.save_to_file(processed_data, date_str)
     
     def fetch_multiple_days(self, start_date: str, num_days: int):
         """Fetch flight data for multiple consecutive days"""
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        # date format YYYY-MM-DD for API
+        dates = [(start_dt + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(num_days)]
         
-        for i in range(num_days):
-            current_date = start_dt + timedelta(days=i)
-            # date format YYYY-MM-DD for API
-            date_str = current_date.strftime('%Y-%m-%d') 
-            
-            print(f"Fetching data for {date_str}...")
-            
-            raw_data = self.get_flight_data(
-                self.config['route']['from'], 
-                self.config['route']['to'], 
-                date_str
-            )
-            
-            processed_data = self.process_flight_data(raw_data, date_str)
-            self.save_to_file(processed_data, date_str)
-            
-            # delay between requests to respect rate limits
-            if i < num_days - 1:
-                time.sleep(self.config['api']['delay_seconds'])
+        # Days are fetched concurrently (the work is waiting on HTTP); the rate limiter keeps the API's pace
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for _ in executor.map(self.fetch_single_day, dates):
+                pass
 
 
 def main():
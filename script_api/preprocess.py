@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import os
 from glob import glob
 
@@ -7,34 +8,37 @@ INPUT_DIR = "output"
 OUTPUT_DIR = "processed_data"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-all_files = glob(os.path.join(INPUT_DIR, "flights_*.xlsx"))
-processed_rows = []
+# API timestamps, e.g. 2025-08-01T00:35:00
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Low-cardinality string columns stored as categoricals in the dashboard's parquet copy
+CATEGORY_COLUMNS = ['Airline Name', 'Time Block', 'Source City', 'Destination City', 'Layover Type']
 
-def classify_time_block(dep_hour):
-    if dep_hour < 11:
-        return "Morning"
-    elif 11 <= dep_hour < 17:
-        return "Afternoon"
-    else:
-        return "Evening"
+# Per-day files from main.py, in order of preference: Parquet (the default output),
+# then Excel/CSV for days that were exported before Parquet was the default
+READERS = {".parquet": pd.read_parquet, ".csv": pd.read_csv, ".xlsx": pd.read_excel}
+day_files = {}
+for ext in READERS:
+    for file in glob(os.path.join(INPUT_DIR, f"flights_*{ext}")):
+        day_files.setdefault(os.path.splitext(os.path.basename(file))[0], file)
+all_files = [day_files[day] for day in sorted(day_files)]
+processed_rows = []
 
 for file in all_files:
-    df = pd.read_excel(file)
+    df = READERS[os.path.splitext(file)[1]](file)
 
-    # Parse datetime columns
-    df['Departure Date'] = pd.to_datetime(df['Departure Time']).dt.date
-    df['Departure Full Time'] = pd.to_datetime(df['Departure Time']).dt.time
-    df['Departure Hour'] = pd.to_datetime(df['Departure Time']).dt.hour
-    df['Arrival Date'] = pd.to_datetime(df['Arrival Time']).dt.date
-    df['Arrival Full Time'] = pd.to_datetime(df['Arrival Time']).dt.time
-    df['Arrival Hour'] = pd.to_datetime(df['Arrival Time']).dt.hour
+    # Parse datetime columns (each column once, with an explicit format so nothing is inferred)
+    dep = pd.to_datetime(df['Departure Time'], format=TIME_FORMAT)
+    arr = pd.to_datetime(df['Arrival Time'], format=TIME_FORMAT)
+    df['Departure Date'], df['Departure Full Time'], df['Departure Hour'] = dep.dt.date, dep.dt.time, dep.dt.hour
+    df['Arrival Date'], df['Arrival Full Time'], df['Arrival Hour'] = arr.dt.date, arr.dt.time, arr.dt.hour
 
     # Tax and total fare (as new columns)
     df['Tax'] = df['Base Fare'] * 0.05
     df['Total Fare'] = df['Base Fare'] + df['Tax']
 
-    # Time block classification
-    df['Time Block'] = df['Departure Hour'].apply(classify_time_block)
+    # Time block classification: before 11 Morning, 11-17 Afternoon, otherwise Evening
+    h = df['Departure Hour'].values
+    df['Time Block'] = np.select([h < 11, h < 17], ['Morning', 'Afternoon'], default='Evening')
 
     processed_rows.append(df)
 
@@ -44,12 +48,40 @@ df_all = pd.concat(processed_rows, ignore_index=True)
 # Save enriched flat file
 df_all.to_csv(os.path.join(OUTPUT_DIR, "aggregated_flight_data.csv"), index=False)
 
-# Grouped summary (for frontend dashboard)
-summary = df_all.groupby(['Airline Name', 'Departure Date', 'Time Block']).agg({
-    'Total Fare': ['mean', 'count']
-}).reset_index()
+# Typed parquet copy for the dashboard (datetimes + categoricals, so the app does no parsing)
+df_typed = df_all.copy()
+df_typed['Date'] = pd.to_datetime(df_typed['Date'], format="%Y-%m-%d")
+for col in ["Departure Time", "Arrival Time"]:
+    df_typed[col] = pd.to_datetime(df_typed[col], format=TIME_FORMAT)
+for col in ["Departure Date", "Arrival Date"]:
+    df_typed[col] = pd.to_datetime(df_typed[col])  # already datetime.date objects
+df_typed['DateStr'] = df_typed['Date'].dt.strftime('%Y-%m-%d').astype('category')
+# Compact dtypes: repeated strings as categoricals, hours as int8
+df_typed[CATEGORY_COLUMNS] = df_typed[CATEGORY_COLUMNS].astype('category')
+df_typed[['Departure Hour', 'Arrival Hour']] = df_typed[['Departure Hour', 'Arrival Hour']].astype('int8')
+# Sorted by fare so row-group statistics support price-range predicate pushdown in the app
+df_typed = df_typed.sort_values('Total Fare', kind='stable')
 
-summary.columns = ['Airline Name', 'Date', 'Time Block', 'Avg Price', 'Flight Count']
+# Fare cube (sum + count per date/airline/time block/hour) so the dashboard charts can average small slices
+# (summed from the full-precision fares, before they are downcast below)
+cube = df_typed.groupby(['DateStr', 'Airline Name', 'Time Block', 'Departure Hour'], observed=True).agg(
+    sum_fare=('Total Fare', 'sum'),
+    count=('Total Fare', 'count')
+).reset_index()
+cube.to_parquet(os.path.join(OUTPUT_DIR, "fare_cube.parquet"), engine="pyarrow", compression="zstd", index=False)
+
+# float32 is ample for rupee fares and halves the bytes the app filters and groups over
+df_typed[['Base Fare', 'Tax', 'Total Fare']] = df_typed[['Base Fare', 'Tax', 'Total Fare']].astype('float32')
+df_typed.to_parquet(
+    os.path.join(OUTPUT_DIR, "aggregated_flight_data.parquet"),
+    engine="pyarrow", compression="zstd", index=False, row_group_size=50_000
+)
+
+# Grouped summary (for frontend dashboard)
+summary = df_all.groupby(['Airline Name', 'Departure Date', 'Time Block'], observed=True).agg(**{
+    'Avg Price': ('Total Fare', 'mean'),
+    'Flight Count': ('Total Fare', 'count')
+}).reset_index().rename(columns={'Departure Date': 'Date'})
 summary.to_csv(os.path.join(OUTPUT_DIR, "summary_by_airline_time.csv"), index=False)
 
 print("✅ Processing complete. Files saved in /processed_data")
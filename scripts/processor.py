@@ -1,62 +1,123 @@
 import os
-import pandas as pd
-import numpy as np
+import polars as pl
 from glob import glob
 
-def load_all_raw_data(raw_dir):
-    files = glob(os.path.join(raw_dir, '*.parquet'))
-    dfs = [pd.read_parquet(f) for f in files]
-    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
-
-def clean_data(df):
-    # Convert Total_Fare to numeric (should already be int, but just in case)
-    df['Total_Fare'] = pd.to_numeric(df['Total_Fare'], errors='coerce')
-    # Parse Departure_Time to hour
-    df['Dep_Hour'] = pd.to_datetime(df['Departure_Time'], format='%I:%M %p', errors='coerce').dt.hour
-    # Bucket departure time
-    def bucket_time(hour):
-        if pd.isna(hour): return 'Unknown'
-        if hour < 11: return 'Morning'
-        elif hour < 17: return 'Afternoon'
-        else: return 'Evening'
-    df['Departure_Segment'] = df['Dep_Hour'].apply(bucket_time)
-    # Day of week
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    df['DayOfWeek'] = df['Date'].dt.day_name()
-    df['IsWeekend'] = df['DayOfWeek'].isin(['Saturday', 'Sunday'])
-    return df
-
-def remove_outliers_iqr(df):
-    # Remove outliers per airline using IQR
-    def iqr_filter(group):
-        q1 = group['Total_Fare'].quantile(0.25)
-        q3 = group['Total_Fare'].quantile(0.75)
-        iqr = q3 - q1
-        lower = q1 - 1.5 * iqr
-        upper = q3 + 1.5 * iqr
-        return group[(group['Total_Fare'] >= lower) & (group['Total_Fare'] <= upper)]
-    return df.groupby('Airline_Name', group_keys=False).apply(iqr_filter)
+# Scraped formats: dates as 2025-07-26, departure times as 6:05 PM
+DATE_FORMAT = '%Y-%m-%d'
+TIME_FORMAT = '%I:%M %p'
+# Departure segments: hours before 11 are Morning, before 17 Afternoon, the rest Evening
+SEGMENT_BOUNDS = pl.Series([11, 17], dtype=pl.Int8)
+SEGMENTS = pl.Series(['Morning', 'Afternoon', 'Evening', 'Unknown'])
+# Weekday names as an enum, so DayOfWeek is stored as one-byte codes
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+WEEKDAYS = pl.Series(WEEKDAY_NAMES, dtype=pl.Enum(WEEKDAY_NAMES))
+# Low-cardinality strings kept as categoricals, so the groupbys hash integer codes
+CATEGORY_COLUMNS = ['Airline_Name', 'Departure_Segment']
+# Schema of a scraped flight record (see scraper_core.py); anything else in a raw file is never decoded
+RAW_SCHEMA = {
+    'Flight_Number': pl.String, 'Source_City': pl.String, 'Destination_City': pl.String,
+    'Source_Airport': pl.String, 'Destination_Airport': pl.String, 'Date': pl.String,
+    'Departure_Time': pl.String, 'Arrival_Time': pl.String, 'Base_Fare': pl.Int64, 'Tax': pl.Int64,
+    'Total_Fare': pl.Int64, 'Layover': pl.String, 'Airline_Name': pl.String
+}
+
+def scan_raw(paths):
+    # One scan over all files against the fixed schema: projection and the per-file reads happen
+    # inside a single query, with no per-file frames to concatenate (missing columns read as null,
+    # int32 fares widen to the schema's Int64 and dictionary-encoded strings are read as plain strings)
+    return pl.scan_parquet(
+        paths, schema=RAW_SCHEMA, missing_columns='insert', extra_columns='ignore',
+        cast_options=pl.ScanCastOptions(integer_cast='upcast', categorical_to_string='allow')
+    )
+
+def load_all_raw_data(raw_dir, skip=()):
+    # `skip` holds raw files that were already cleaned elsewhere (see process_single_day)
+    files = [f for f in glob(os.path.join(raw_dir, '*.parquet')) if os.path.abspath(f) not in skip]
+    if not files:
+        return None
+    # Lazy, so cleaning and outlier removal stream through multi-threaded queries (see main)
+    return scan_raw(files)
+
+def clean_data(frame):
+    # Works on a LazyFrame or a DataFrame
+    # Whole-rupee fares as int32 (unparseable ones become null); with the int8 hours below this
+    # halves the bytes the IQR and summary passes stream through
+    total_fare = pl.col('Total_Fare').cast(pl.Int32, strict=False)
+    # Parse Departure_Time to a nullable int8 hour (both string columns are parsed natively with explicit formats,
+    # in the same with_columns pass, so nothing is inferred per value)
+    dep_hour = pl.col('Departure_Time').str.strptime(pl.Time, TIME_FORMAT, strict=False).dt.hour()
+    # Bucket departure time: binary-search each hour into the segment bounds and index the labels
+    # (unparseable times get the trailing 'Unknown' label)
+    segment_idx = pl.lit(SEGMENT_BOUNDS).search_sorted(pl.col('Dep_Hour'), side='right').cast(pl.UInt32)
+    segment = pl.lit(SEGMENTS).gather(pl.when(pl.col('Dep_Hour').is_null()).then(len(SEGMENTS) - 1).otherwise(segment_idx))
+    # Day of week from the integer ISO weekday (Monday=1): names are looked up, the weekend is a compare
+    date = pl.col('Date').str.to_datetime(DATE_FORMAT, strict=False)
+    weekday = pl.col('Date').dt.weekday()
+    return (
+        frame
+        .with_columns(total_fare.alias('Total_Fare'), dep_hour.alias('Dep_Hour'), date.alias('Date'))
+        .with_columns(
+            segment.alias('Departure_Segment'),
+            pl.lit(WEEKDAYS).gather(weekday - 1).alias('DayOfWeek'),
+            (weekday >= 6).fill_null(False).alias('IsWeekend')
+        )
+        .with_columns(pl.col(CATEGORY_COLUMNS).cast(pl.Categorical))
+    )
+
+def process_single_day(path):
+    # Clean one raw day file; the pipeline runs this in a worker while scraping continues
+    return clean_data(scan_raw(path)).collect(engine='streaming')
+
+def iqr_bounds(frame):
+    # Per-airline IQR bounds: quartiles in one small aggregation that only reads the airline and fare columns
+    fare = pl.col('Total_Fare')
+    q1, q3 = pl.col('q1'), pl.col('q3')
+    return (
+        frame.select('Airline_Name', 'Total_Fare').group_by('Airline_Name')
+        .agg(fare.quantile(0.25, interpolation='linear').alias('q1'), fare.quantile(0.75, interpolation='linear').alias('q3'))
+        .select('Airline_Name', (q1 - 1.5 * (q3 - q1)).alias('lower'), (q3 + 1.5 * (q3 - q1)).alias('upper'))
+    )
+
+def remove_outliers_iqr(frame, bounds):
+    # Remove outliers per airline using IQR: the bounds (see iqr_bounds) are joined back for a single filter.
+    # Inner join: rows without an airline have no group to be compared against
+    return (
+        frame.join(bounds, on='Airline_Name', maintain_order='left')
+        .filter(pl.col('Total_Fare').is_between(pl.col('lower'), pl.col('upper')))
+        .drop('lower', 'upper')
+    )
 
 def aggregate(df):
-    by_airline = df.groupby('Airline_Name')['Total_Fare'].mean().reset_index().rename(columns={'Total_Fare': 'Avg_Fare'})
-    by_segment = df.groupby('Departure_Segment')['Total_Fare'].mean().reset_index().rename(columns={'Total_Fare': 'Avg_Fare'})
-    return by_airline, by_segment
+    def mean_fare_by(key):
+        return df.group_by(key).agg(pl.col('Total_Fare').mean().alias('Avg_Fare')).drop_nulls(key).sort(key)
+    return mean_fare_by('Airline_Name'), mean_fare_by('Departure_Segment')
 
-def main():
+def main(cleaned_days=None):
+    # cleaned_days: optional {raw file path: cleaned DataFrame} already produced by process_single_day
+    cleaned_days = {os.path.abspath(path): day for path, day in (cleaned_days or {}).items()}
     raw_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/raw'))
     processed_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/processed'))
     os.makedirs(processed_dir, exist_ok=True)
-    df = load_all_raw_data(raw_dir)
-    if df.empty:
+    raw = load_all_raw_data(raw_dir, skip=cleaned_days)
+    frames = [day.lazy() for day in cleaned_days.values()]
+    if raw is not None:
+        frames.insert(0, clean_data(raw))
+    if not frames:
         print('No data found.')
         return
-    df = clean_data(df)
-    df = remove_outliers_iqr(df)
-    df.to_parquet(os.path.join(processed_dir, 'all_flights_cleaned.parquet'), index=False)
-    by_airline, by_segment = aggregate(df)
-    by_airline.to_csv(os.path.join(processed_dir, 'monthly_summary_by_airline.csv'), index=False)
-    by_segment.to_csv(os.path.join(processed_dir, 'monthly_summary_by_segment.csv'), index=False)
+    frame = pl.concat(frames, how='diagonal_relaxed')
+    # Two streamed passes over the raw files. The first only reads airline and fare to compute the small
+    # per-airline bounds frame (the quartiles buffer those two columns); the second cleans, filters against
+    # the eager bounds and writes surviving rows out as they pass, so the full cleaned frame is never held
+    # in memory. The summaries then read back just the columns they need from the cleaned file. Days
+    # cleaned during scraping (cleaned_days) are already in memory and are reused as they are
+    bounds = iqr_bounds(frame).collect(engine='streaming')
+    cleaned_path = os.path.join(processed_dir, 'all_flights_cleaned.parquet')
+    remove_outliers_iqr(frame, bounds.lazy()).sink_parquet(cleaned_path, engine='streaming')
+    by_airline, by_segment = pl.collect_all(aggregate(pl.scan_parquet(cleaned_path)), engine='streaming')
+    by_airline.write_csv(os.path.join(processed_dir, 'monthly_summary_by_airline.csv'))
+    by_segment.write_csv(os.path.join(processed_dir, 'monthly_summary_by_segment.csv'))
     print('Processing complete. Dashboard-ready files saved.')
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,405 @@
+import os
+import asyncio
+import json
+import random
+import re
+from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.parquet as pq
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+# Shared MakeMyTrip scraping logic; scraper.py and scraper_stealth.py only differ in their config and
+# browser profile (see DEFAULT_PROFILE)
+
+# Raw day file schema, declared up front so writing a day does no type inference. Repeated strings
+# (route, date, layover, airline) are dictionary-encoded; Base_Fare/Tax are not stored, the site never
+# shows them (the processor reads them back as null)
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+FLIGHT_SCHEMA = pa.schema([
+    ('Flight_Number', pa.string()),
+    ('Source_City', CATEGORY),
+    ('Destination_City', CATEGORY),
+    ('Source_Airport', CATEGORY),
+    ('Destination_Airport', CATEGORY),
+    ('Date', CATEGORY),
+    ('Departure_Time', pa.string()),
+    ('Arrival_Time', pa.string()),
+    ('Total_Fare', pa.int32()),
+    ('Layover', CATEGORY),
+    ('Airline_Name', CATEGORY)
+])
+
+# Everything in a fare text that isn't a digit (₹, commas, spaces)
+NON_DIGITS = re.compile(r'\D+')
+
+# Fare selectors, in order of preference
+FARE_SELECTORS = [
+    'span.fontSize18.blackFont',
+    '.fontSize18.blackFont',
+    'div.blackText.fontSize18.blackFont.white-space-no-wrap',
+    '.price',
+    'span[data-cy="price"]',
+    '.fare-price',
+    '.total-fare'
+]
+
+# Runs in the page: the trimmed text of each field of every flight card (null when the field is absent),
+# plus the fare text
+EXTRACT_CARDS_JS = """
+(fareSelectors) => {
+    let cards = document.querySelectorAll('div.listingCard');
+    if (!cards.length) cards = document.querySelectorAll('div.timingOptionOuter');
+    const text = (card, selector) => card.querySelector(selector)?.innerText.trim() ?? null;
+    // Fare: first selector whose text holds a digit, trying the one that matched the previous card first
+    let fareOrder = fareSelectors;
+    const fare = card => {
+        for (const selector of fareOrder) {
+            const value = text(card, selector);
+            if (value && /\\d/.test(value)) {
+                if (selector !== fareOrder[0]) fareOrder = [selector, ...fareSelectors.filter(s => s !== selector)];
+                return value;
+            }
+        }
+        return null;
+    };
+    return Array.from(cards, card => ({
+        airline: text(card, 'p.airlineName, .airlineName'),
+        flight_number: text(card, 'p.fliCode, .fliCode'),
+        dep_time: text(card, '.timeInfoLeft .flightTimeInfo span, .timeInfoLeft span'),
+        arr_time: text(card, '.timeInfoRight .flightTimeInfo span, .timeInfoRight span'),
+        layover: text(card, 'p.flightsLayoverInfo, .flightsLayoverInfo'),
+        fare: fare(card),
+    }));
+}
+"""
+
+# Resource types the extraction never needs (stylesheets stay: visibility checks and innerText use them)
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+# Third-party analytics/ad trackers, whatever their resource type
+BLOCKED_URL_PARTS = ('google-analytics', 'doubleclick', 'googletagmanager', 'facebook')
+
+# How the browser presents itself and how patiently each page is handled
+DEFAULT_PROFILE = {
+    'launch_args': [
+        '--disable-blink-features=AutomationControlled',
+        '--disable-dev-shm-usage',
+        '--no-sandbox',
+        '--disable-setuid-sandbox'
+    ],
+    # Realistic browser settings
+    'context_options': {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'viewport': {'width': 1366, 'height': 768},
+        'locale': 'en-US',
+        'timezone_id': 'Asia/Kolkata'
+    },
+    # Remove webdriver property
+    'init_script': """
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined,
+        });
+    """,
+    'file_prefix': '',                  # Day files are saved as <prefix><YYYY-MM-DD>.parquet
+    'user_data_dir': '.playwright_profile',  # Browser profile kept next to the output dir between runs
+    'state_file': '.mmt_state.json',    # Portable copy of its cookies/storage, to seed a fresh profile
+    'goto_timeout': 30000,
+    'results_timeout': 20000,
+    'refresh_on_network_problem': True,  # Otherwise give up on the date straight away
+    'popup_timeout': 3000,              # How long to wait for the comparison popup to show up
+    'check_title': False,               # Give up on block/CAPTCHA pages recognised by their title
+    'click_pause': None,                # Optional (min, max) seconds to pause before clicking a popup
+    'max_cards': None                   # Optional cap on cards extracted per date
+}
+
+# Helper to get target dates
+def get_target_dates(days):
+    today = datetime.today()
+    return [(today + timedelta(days=i+1)) for i in range(days)]
+
+# Convert date to MakeMyTrip format (DD/MM/YYYY)
+def format_date_for_mmt(date_obj):
+    return date_obj.strftime('%d/%m/%Y')
+
+# Construct MakeMyTrip search URL with correct date format
+def build_url(config, dep_date_mmt):
+    return f"https://www.makemytrip.com/flight/search?itinerary={config['source_airport']}-{config['destination_airport']}-{dep_date_mmt}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
+
+async def block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Block until the page shows flight cards or the network error banner (no fixed sleep after navigation);
+# on timeout the caller's own checks decide what to do
+async def wait_for_results_or_error(page, timeout=20000):
+    results = page.locator('div.listingCard, div.timingOptionOuter').or_(page.locator('text=NETWORK PROBLEM'))
+    try:
+        await results.first.wait_for(timeout=timeout)
+    except Exception:
+        pass
+
+# Poll the card count until it holds steady across two polls (the list has finished streaming in),
+# so extraction starts as soon as the results are complete rather than after a fixed wait
+async def wait_for_cards_to_settle(page, timeout=20, interval=0.5):
+    cards = page.locator('div.listingCard, div.timingOptionOuter')
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    previous, stable = -1, 0
+    while loop.time() < deadline:
+        count = await cards.count()
+        stable = stable + 1 if count == previous and count > 0 else 0
+        if stable >= 2:
+            return
+        previous = count
+        await asyncio.sleep(interval)
+
+async def launch_context(playwright, config, profile):
+    # Persistent context: cookies (including the bot manager's trust tokens), local storage and the HTTP
+    # cache survive between runs, so warm runs skip the bot challenge and cached assets
+    user_data_dir = os.path.join(config['output_dir'], '..', profile['user_data_dir'])
+    state_path = os.path.join(config['output_dir'], '..', profile['state_file'])
+    fresh_profile = not os.path.isdir(user_data_dir)
+    context = await playwright.chromium.launch_persistent_context(
+        user_data_dir, headless=config['headless'], args=profile['launch_args'], **profile['context_options']
+    )
+    # A new profile (another machine, wiped data dir) starts from the last exported cookies instead of a
+    # cold bot challenge
+    if fresh_profile and os.path.exists(state_path):
+        with open(state_path) as f:
+            await context.add_cookies(json.load(f)['cookies'])
+    await context.add_init_script(profile['init_script'])
+    # Fail fast on pages that hang, so one broken date doesn't hold a slot for minutes
+    context.set_default_timeout(15000)
+    context.set_default_navigation_timeout(30000)
+    # Skip downloading images, fonts, media and trackers; the flight data arrives as HTML/XHR
+    await context.route('**/*', block_heavy_resources)
+    return context
+
+async def open_results(page, url, profile):
+    # Load the search page and get past the error banner and popups; False when the date can't be scraped
+    # Return from navigation once the response starts (the SPA fetches the listing afterwards), then
+    # continue as soon as results or the error banner render
+    try:
+        await page.goto(url, wait_until='commit', timeout=profile['goto_timeout'])
+    except PlaywrightTimeoutError:
+        print("  ❌ Page load timed out, skipping this date")
+        return False
+    await wait_for_results_or_error(page, timeout=profile['results_timeout'])
+
+    if profile['check_title']:
+        # Check page title to detect blocks
+        title = await page.title()
+        print(f"  📄 Page title: {title}")
+        if "blocked" in title.lower() or "captcha" in title.lower() or len(title) < 10:
+            print("  🚫 Detected blocking/CAPTCHA page")
+            return False
+
+    if profile['refresh_on_network_problem'] and await page.locator('text=NETWORK PROBLEM').count():
+        print("  ⚠️ Network problem detected, trying refresh...")
+        try:
+            await page.click('button:has-text("REFRESH")', timeout=5000)
+        except:
+            await page.reload(wait_until='commit')
+        # The old banner may still be up, so only flight cards count as recovered here
+        try:
+            await page.wait_for_selector('div.listingCard, div.timingOptionOuter', timeout=15000)
+        except Exception:
+            pass
+
+    if await page.locator('text=NETWORK PROBLEM').count():
+        print("  ❌ Network problem persists, skipping this date")
+        return False
+
+    print("  Handling popups...")
+    try:
+        # to close "GOT IT" popup (clicked the moment it shows up)
+        popup_button = page.locator('button:has-text("GOT IT")')
+        await popup_button.wait_for(state='visible', timeout=profile['popup_timeout'])
+        if profile['click_pause']:
+            # Human-like pause before the click
+            await asyncio.sleep(random.uniform(*profile['click_pause']))
+        await popup_button.click()
+        print("  ✓ Closed Flight Comparison popup")
+    except Exception:
+        print("  No Flight Comparison popup found")
+    try:
+        close_modal = page.locator('button[data-cy="closeModal"]')
+        await close_modal.wait_for(state='visible', timeout=3000)
+        await close_modal.click()
+    except Exception:
+        pass
+
+    print("  Waiting for flight results...")
+    try:
+        await page.wait_for_selector('div.listingCard, div.timingOptionOuter', timeout=profile['results_timeout'])
+        # Cards can attach before their content renders; the airline name marks a filled card
+        try:
+            await page.wait_for_selector('p.airlineName', timeout=15000)
+        except Exception:
+            pass
+        await wait_for_cards_to_settle(page)
+    except Exception as e:
+        print(f"Timeout waiting for flight results: {e}")
+        print(f"  📝 Page content preview: {(await page.content())[:200]}...")
+        return False
+    return True
+
+# Per-card columns of a day file; the route and date columns are the same for every row
+CARD_COLUMNS = ('Flight_Number', 'Departure_Time', 'Arrival_Time', 'Total_Fare', 'Layover', 'Airline_Name')
+
+def build_flights(cards, config, dep_date_str):
+    # Turn the extracted card texts into a day table, keeping only cards with an airline and a fare.
+    # Rows are appended straight into per-column lists, the layout Arrow stores them in
+    columns = {name: [] for name in CARD_COLUMNS}
+    for i, card in enumerate(cards):
+        try:
+            airline = card['airline']
+            flight_number = card['flight_number']
+            dep_time = card['dep_time']
+            arr_time = card['arr_time']
+            layover = card['layover'] if card['layover'] is not None else "non-stop"
+
+            # Extract numbers from fare text (remove ₹, commas, etc.)
+            total_fare = int(NON_DIGITS.sub('', card['fare'])) if card['fare'] else None
+
+            # Only add flight if we have essential data
+            if airline and total_fare:
+                columns['Flight_Number'].append(flight_number or f"Unknown-{i+1}")
+                columns['Departure_Time'].append(dep_time or "Unknown")
+                columns['Arrival_Time'].append(arr_time or "Unknown")
+                columns['Total_Fare'].append(total_fare)
+                columns['Layover'].append(layover)
+                columns['Airline_Name'].append(airline)
+                print(f"Extracted: {flight_number or 'N/A'} | {airline} | {dep_time}-{arr_time} | ₹{total_fare}")
+            else:
+                print(f"Missing essential data for flight {i+1} (airline: {airline}, fare: {total_fare})")
+
+                # Debug missing data
+                if not airline:
+                    print(f"      Missing airline - tried selectors: p.airlineName, .airlineName")
+                if not total_fare:
+                    print(f"      Missing fare - tried multiple fare selectors")
+
+        except Exception as e:
+            print(f"Error extracting flight {i+1}: {e}")
+            continue
+
+    # Constant columns as a single-entry dictionary with all-zero indices
+    indices = pa.array([0] * len(columns['Total_Fare']), type=pa.int32())
+    def constant(value):
+        return pa.DictionaryArray.from_arrays(indices, pa.array([value], type=pa.string()))
+    return pa.Table.from_pydict({
+        **columns,
+        'Source_City': constant(config['source_city']),
+        'Destination_City': constant(config['destination_city']),
+        'Source_Airport': constant(config['source_airport']),
+        'Destination_Airport': constant(config['destination_airport']),
+        'Date': constant(dep_date_str)
+    }).select(FLIGHT_SCHEMA.names).cast(FLIGHT_SCHEMA)
+
+# Main scraping logic
+async def scrape_flights_for_date(context, config, dep_date_str, dep_date_mmt, profile=DEFAULT_PROFILE):
+    page = await context.new_page()
+
+    url = build_url(config, dep_date_mmt)
+    print(f"  Accessing URL: {url}")
+
+    try:
+        if not await open_results(page, url, profile):
+            return None
+
+        # Read every card in one round trip instead of a query_selector/inner_text call per field
+        cards = await page.evaluate(EXTRACT_CARDS_JS, FARE_SELECTORS)
+        print(f"  Found {len(cards)} flight cards")
+
+        if len(cards) == 0:
+            print("No flight cards found with current selectors")
+            print("Page title:", await page.title())
+            return None
+
+        return build_flights(cards[:profile['max_cards']], config, dep_date_str)
+    except Exception as e:
+        print(f"Error loading page: {e}")
+        return None
+    finally:
+        await page.close()
+
+async def scrape_day(context, config, profile, job, label, is_last, slots, on_day_complete):
+    # Scrape and save one date while holding a slot; the slot's own throttle delay runs before it is
+    # released, so other dates keep loading in the remaining slots meanwhile
+    dep_date_str, dep_date_mmt, out_path = job
+
+    if os.path.exists(out_path):
+        print(f"{label} Skipping {dep_date_str}, already scraped.")
+        return
+
+    async with slots:
+        print(f"{label} Scraping for {dep_date_str}...")
+
+        try:
+            flights = await scrape_flights_for_date(context, config, dep_date_str, dep_date_mmt, profile)
+            if flights is not None and flights.num_rows:
+                pq.write_table(flights, out_path, compression='zstd', compression_level=5)
+                print(f"  ✅ Saved {flights.num_rows} flights to {out_path}")
+                if on_day_complete:
+                    on_day_complete(out_path)
+            else:
+                print(f"  ⚠ No flights found for {dep_date_str}")
+        except Exception as e:
+            print(f"  ✗ Error scraping {dep_date_str}: {e}")
+            return
+
+        # Export the state that just got past the bot checks; a failure here leaves the saved day and the
+        # throttle below alone
+        if flights is not None and flights.num_rows:
+            try:
+                await context.storage_state(path=os.path.join(config['output_dir'], '..', profile['state_file']))
+            except Exception as e:
+                print(f"  ⚠ Could not export storage state: {e}")
+
+        # Throttle to avoid anti-bot measures
+        if not is_last:
+            wait_time = random.uniform(config['delay_min'], config['delay_max'])
+            print(f"  Waiting {wait_time:.1f}s before next request...")
+            await asyncio.sleep(wait_time)
+
+async def main_async(config, profile=DEFAULT_PROFILE, on_day_complete=None):
+    # Create output directory
+    os.makedirs(config['output_dir'], exist_ok=True)
+
+    # Get target dates
+    dates = get_target_dates(config['days_to_scrape'])
+    # Every per-date string (ISO date, MakeMyTrip date, output path) is formatted once, up front
+    jobs = []
+    for dep_date_obj in dates:
+        dep_date_str = dep_date_obj.strftime('%Y-%m-%d')
+        out_path = os.path.join(config['output_dir'], f"{profile['file_prefix']}{dep_date_str}.parquet")
+        jobs.append((dep_date_str, format_date_for_mmt(dep_date_obj), out_path))
+
+    print(f"Starting scrape for {len(dates)} days from {config['source_city']} to {config['destination_city']}")
+    print(f"Route: {config['source_airport']} → {config['destination_airport']}")
+    print(f"Output directory: {config['output_dir']}")
+    print(f"Delay range: {config['delay_min']}-{config['delay_max']} seconds")
+    print(f"Parallel dates: {config['max_parallel']}")
+    print("-" * 60)
+
+    slots = asyncio.Semaphore(config['max_parallel'])
+    async with async_playwright() as playwright:
+        # One browser context for the whole run; each date only opens a page (tab) in it
+        context = await launch_context(playwright, config, profile)
+        try:
+            await asyncio.gather(*(
+                scrape_day(context, config, profile, job, f"[{i}/{len(jobs)}]", i == len(jobs), slots, on_day_complete)
+                for i, job in enumerate(jobs, 1)
+            ))
+        finally:
+            await context.close()
+
+    print("-" * 60)
+    print("Scraping completed!")
+
+def main(config, profile=DEFAULT_PROFILE, on_day_complete=None):
+    # on_day_complete(path) is called after each day's parquet is written
+    asyncio.run(main_async(config, profile, on_day_complete))